@@ -2,54 +2,381 @@
 """
 Internet Restriction Checker
 A script to detect if your internet connection is being restricted, throttled, or blocked.
+
+Usage: check_internet_restriction.py [--json] [--quiet] [--skip-dns] [--skip-http] [--only=mtu,ping]
+       check_internet_restriction.py --monitor [--interval=60]
 """
 
+import argparse
+import asyncio
 import socket
 import time
-import subprocess
 import sys
 import json
+import re
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional, TextIO
 
 # Try to import optional dependencies
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
 
 try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - lets httpx negotiate HTTP/2
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+try:
+    import dns.exception
     import dns.resolver
+    import dns.asyncresolver
     DNSPYTHON_AVAILABLE = True
 except ImportError:
     DNSPYTHON_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx is preferred; requests remains as a fallback HTTP client
+HTTP_AVAILABLE = HTTPX_AVAILABLE or REQUESTS_AVAILABLE
+
+_HTTP_TIMEOUT_ERRORS: Tuple[type, ...] = ()
+_HTTP_CONNECT_ERRORS: Tuple[type, ...] = ()
+if HTTPX_AVAILABLE:
+    _HTTP_TIMEOUT_ERRORS += (httpx.TimeoutException,)
+    _HTTP_CONNECT_ERRORS += (httpx.ConnectError,)
+if REQUESTS_AVAILABLE:
+    _HTTP_TIMEOUT_ERRORS += (requests.exceptions.Timeout,)
+    _HTTP_CONNECT_ERRORS += (requests.exceptions.ConnectionError,)
+
+# Only genuine echo replies; ICMP errors ("From ... icmp_seq=1 Packet filtered",
+# "Destination Host Unreachable") also carry icmp_seq but no byte count or time
+_PING_REPLY_RE = re.compile(r"^\d+ bytes from .*\bicmp_seq=(\d+)\b.*\btime[=<]")
+# Linux (iputils) numbers echo requests from 1, macOS/BSD from 0
+_PING_FIRST_SEQ = 0 if sys.platform == "darwin" else 1
+_PING_TIME_RE = re.compile(r"time[=<]([\d.]+) ?ms")
+_PING_LOSS_RE = re.compile(r"(\d+(?:\.\d+)?)% packet loss")
+# Linux "rtt min/avg/max/mdev = ..." and macOS "round-trip min/avg/max/stddev = ..."
+_PING_RTT_RE = re.compile(r"min/avg/max/\w+ = [\d.]+/([\d.]+)/")
+
+# Short names used by --only and skip_tests, in run order
+CHECK_NAMES = ("dns", "domains", "ports", "http", "mtu", "dns-servers", "ping", "dpi")
+# Everything except the ping-based checks needs name resolution or a DNS server
+DNS_DEPENDENT_CHECKS = frozenset({"dns", "domains", "ports", "http", "dns-servers", "dpi"})
+HTTP_CHECKS = frozenset({"http", "dpi"})
+
+# Output lines of the check running in the current task, flushed as one block
+_log_buffer: ContextVar[Optional[List[str]]] = ContextVar("_log_buffer", default=None)
+# Result records of the check running in the current task, merged in run order
+_result_buffer: ContextVar[Optional[List[Dict]]] = ContextVar("_result_buffer", default=None)
+
+
+def _to_json(obj, indent: bool = True) -> str:
+    """Serialize results, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _new_http_client():
+    """Create an httpx client; with h2 installed, same-host requests share one connection."""
+    return httpx.AsyncClient(http2=H2_AVAILABLE, timeout=10, follow_redirects=True)
+
 
 class InternetRestrictionChecker:
     """Check for various signs of internet restriction."""
 
-    def __init__(self):
-        self.results = {
+    def __init__(self, dns_concurrency: int = 16, tcp_concurrency: int = 32,
+                 skip_tests: Iterable[str] = (), verbose: bool = True,
+                 out: Optional[TextIO] = None):
+        self.skip_tests = set(skip_tests)
+        self.verbose = verbose
+        # Human-readable report stream; None means the current sys.stdout
+        self.out = out
+        # (domain, nameserver) -> (lookup task, expiry on the monotonic clock)
+        self._dns_cache: Dict[Tuple[str, Optional[str]], Tuple[asyncio.Future, float]] = {}
+
+        # Long-lived dnspython resolvers: one from the system configuration and
+        # one per explicitly probed nameserver, reused by every lookup
+        self._resolver = None
+        self._server_resolvers: Dict[str, object] = {}
+        if DNSPYTHON_AVAILABLE:
+            try:
+                self._resolver = dns.asyncresolver.Resolver()
+            except dns.exception.DNSException:
+                # No usable resolv.conf/registry config; use getaddrinfo instead
+                self._resolver = None
+
+        # Bound in-flight probes so bursts don't trip resolver rate limits
+        self._dns_concurrency = dns_concurrency
+        self._tcp_concurrency = tcp_concurrency
+        self._dns_sem: Optional[asyncio.Semaphore] = None
+        self._tcp_sem: Optional[asyncio.Semaphore] = None
+
+        # Set by check_dns_resolution; name-based checks wait on it and are
+        # skipped when no domain resolved at all
+        self._dns_checked: Optional[asyncio.Event] = None
+        self._offline = False
+
+        self.results = self._new_results()
+
+        # Share one keep-alive connection pool across all HTTP probes
+        self._http = None
+        self._session = None
+        if HTTPX_AVAILABLE:
+            self._http = _new_http_client()
+        elif REQUESTS_AVAILABLE:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    def _new_results(self) -> Dict:
+        """Return an empty result set."""
+        return {
             "timestamp": datetime.now().isoformat(),
             "tests": [],
             "overall_status": "unknown",
             "issues_found": []
         }
 
+    def _reset(self):
+        """Start a fresh run; caches, resolvers and sessions are kept.
+
+        Must be called inside the running loop: before Python 3.10, asyncio
+        primitives bind to the loop that is current when they are created.
+        """
+        self.results = self._new_results()
+        self._offline = False
+        self._dns_checked = asyncio.Event()
+        self._dns_sem = asyncio.Semaphore(self._dns_concurrency)
+        self._tcp_sem = asyncio.Semaphore(self._tcp_concurrency)
+
+    async def aclose(self):
+        """Release pooled HTTP connections."""
+        if self._http is not None:
+            await self._http.aclose()
+        if self._session is not None:
+            self._session.close()
+
+    def log(self, message: str = ""):
+        """Queue a line of output for the current check, or print it directly.
+
+        Per-check output is dropped when verbose is off; the banner and
+        summary always print.
+        """
+        buffer = _log_buffer.get()
+        if buffer is None:
+            print(message, file=self.out)
+        elif self.verbose:
+            buffer.append(message)
+
+    async def _buffered(self, check) -> Tuple[List[str], List[Dict]]:
+        """Run a check in its own task, collecting its output and results."""
+        buffer: List[str] = []
+        records: List[Dict] = []
+        _log_buffer.set(buffer)
+        _result_buffer.set(records)
+        await check
+        return buffer, records
+
+    def _record_result(self, record: Dict):
+        """Store a result record and note it as an issue if it failed."""
+        self.results["tests"].append(record)
+        if not record["passed"]:
+            self.results["issues_found"].append(record["name"])
+
     def add_result(self, test_name: str, passed: bool, details: str):
         """Add a test result."""
-        self.results["tests"].append({
+        record = {
             "name": test_name,
             "passed": passed,
             "details": details
-        })
-        if not passed:
-            self.results["issues_found"].append(test_name)
+        }
+        records = _result_buffer.get()
+        if records is None:
+            self._record_result(record)
+        else:
+            records.append(record)
+
+    async def _http_get(self, url: str, timeout: float = 10, client=None):
+        """Issue an HTTP GET on the shared client, or on a given client/session."""
+        client = client or self._http or self._session
+        if HTTPX_AVAILABLE and isinstance(client, httpx.AsyncClient):
+            return await client.get(url, timeout=timeout)
+        # requests is blocking, so run it off the event loop
+        return await asyncio.to_thread(client.get, url, timeout=timeout)
+
+    async def _timed(self, awaitable) -> Tuple[object, float]:
+        """Await a probe and return its result with the elapsed seconds."""
+        start = time.perf_counter()
+        result = await awaitable
+        return result, time.perf_counter() - start
+
+    async def _resolve_one(self, domain: str, nameserver: Optional[str] = None,
+                           timeout: float = 5) -> str:
+        """Resolve a domain to its first IPv4 address."""
+        if nameserver and DNSPYTHON_AVAILABLE:
+            resolver = self._server_resolvers.get(nameserver)
+            if resolver is None:
+                resolver = dns.asyncresolver.Resolver(configure=False)
+                resolver.nameservers = [nameserver]
+                self._server_resolvers[nameserver] = resolver
+        else:
+            resolver = self._resolver
+
+        async with self._dns_sem:
+            if resolver is not None:
+                # dnspython bounds each query by its own lifetime, no global socket timeout
+                try:
+                    answer = await resolver.resolve(domain, "A", lifetime=timeout)
+                except dns.exception.Timeout as e:
+                    raise asyncio.TimeoutError(str(e)) from e
+                except dns.exception.DNSException as e:
+                    raise socket.gaierror(str(e)) from e
+                return answer[0].to_text()
+
+            loop = asyncio.get_running_loop()
+            # Ask for IPv4 stream results only so libc can skip AAAA queries
+            # and the duplicate per-socket-type entries
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(
+                    domain, None,
+                    family=socket.AF_INET,
+                    type=socket.SOCK_STREAM,
+                    flags=socket.AI_ADDRCONFIG
+                ),
+                timeout=timeout
+            )
+            return infos[0][4][0]
+
+    async def _cached_resolve(self, domain: str, nameserver: Optional[str] = None,
+                              timeout: float = 5, ttl: float = 60,
+                              refresh: bool = False) -> str:
+        """Resolve a domain, reusing recent and in-flight lookups for ttl seconds.
+
+        Only successful lookups stay cached. With refresh, a new lookup is
+        always made and its result replaces the cached one.
+        """
+        if not DNSPYTHON_AVAILABLE:
+            # Without dnspython every lookup goes through the system resolver
+            nameserver = None
+
+        key = (domain, nameserver)
+        now = time.monotonic()
+        entry = self._dns_cache.get(key)
+        if refresh or entry is None or now >= entry[1]:
+            task = asyncio.ensure_future(self._resolve_one(domain, nameserver, timeout))
+            entry = self._dns_cache[key] = (task, now + ttl)
+            task.add_done_callback(lambda done: self._evict_failed(key, done))
+        return await entry[0]
+
+    def _evict_failed(self, key: Tuple[str, Optional[str]], task: asyncio.Future):
+        """Drop a failed or cancelled lookup so the next caller queries DNS again."""
+        if not task.cancelled() and task.exception() is None:
+            return
+        entry = self._dns_cache.get(key)
+        if entry is not None and entry[0] is task:
+            del self._dns_cache[key]
+
+    async def _connect_one(self, host: str, port: int, timeout: float = 5) -> float:
+        """Open and immediately close a TCP connection; return the handshake time."""
+        addr = await self._cached_resolve(host)
+        async with self._tcp_sem:
+            # Time only the handshake, not the lookup or the wait for a slot
+            start = time.perf_counter()
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(addr, port), timeout=timeout
+            )
+            elapsed = time.perf_counter() - start
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                # A reset while closing doesn't change that the port was open
+                pass
+        return elapsed
+
+    async def _ping(self, args: List[str], timeout: float,
+                    stop_after: Optional[int] = None) -> Tuple[Optional[int], str]:
+        """Run ping without blocking the event loop; return (returncode, stdout).
+
+        With stop_after, ping is terminated as soon as echo replies to the first
+        stop_after packets have all arrived, and returncode is None.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            "ping", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        lines: List[str] = []
+        seqs: List[int] = []
+
+        async def read_output() -> bool:
+            async for raw in proc.stdout:
+                line = raw.decode(errors="replace")
+                lines.append(line)
+                match = _PING_REPLY_RE.match(line) if stop_after else None
+                if match:
+                    seqs.append(int(match.group(1)))
+                    # Stop only if the first packets all came back; any gap means loss
+                    if len(seqs) == stop_after and \
+                            seqs == list(range(_PING_FIRST_SEQ, _PING_FIRST_SEQ + stop_after)):
+                        return True
+            return False
+
+        try:
+            stopped_early = await asyncio.wait_for(read_output(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        if stopped_early:
+            proc.terminate()
+        await proc.wait()
+        return None if stopped_early else proc.returncode, "".join(lines)
+
+    def _skip_if_requested(self, check: str, test_name: str) -> bool:
+        """Record test_name as skipped if the user excluded this check."""
+        if check not in self.skip_tests:
+            return False
+        self.log("  ⚠ Skipped by user")
+        self.add_result(test_name, True, "skipped by user")
+        return True
+
+    async def _skip_if_offline(self, test_name: str) -> bool:
+        """Wait for the DNS check and record test_name as skipped if it found no DNS."""
+        await self._dns_checked.wait()
+        if self._offline:
+            self.log("  ✗ Skipped - DNS resolution failed for every domain")
+            self.add_result(test_name, False, "skipped - no DNS")
+        return self._offline
 
-    def check_dns_resolution(self) -> bool:
+    async def check_dns_resolution(self) -> bool:
         """Check if DNS resolution is working for various domains."""
-        print("\n[1] Checking DNS resolution...")
+        self.log("\n[1] Checking DNS resolution...")
+
+        if self._skip_if_requested("dns", "DNS Resolution"):
+            self._dns_checked.set()
+            return True
 
         test_domains = [
             ("google.com", "8.8.8.8"),
@@ -57,26 +384,31 @@ class InternetRestrictionChecker:
             ("github.com", "8.8.8.8"),
         ]
 
-        all_passed = True
-
-        for domain, dns_server in test_domains:
-            try:
-                socket.setdefaulttimeout(5)
-                start = time.time()
-                addr = socket.gethostbyname(domain)
-                elapsed = time.time() - start
-
-                if addr:
-                    print(f"  ✓ {domain} -> {addr} ({elapsed:.3f}s)")
+        try:
+            outcomes = await asyncio.gather(
+                # Always probe DNS here; the fresh answers then serve the other checks
+                *(self._timed(self._cached_resolve(domain, refresh=True))
+                  for domain, _ in test_domains),
+                return_exceptions=True
+            )
+            failed_count = sum(isinstance(outcome, Exception) for outcome in outcomes)
+            self._offline = failed_count == len(test_domains)
+        finally:
+            self._dns_checked.set()
+
+        all_passed = failed_count == 0
+
+        if self.verbose:
+            for (domain, dns_server), outcome in zip(test_domains, outcomes):
+                if isinstance(outcome, socket.gaierror):
+                    self.log(f"  ✗ {domain} - DNS failed: {outcome}")
+                elif isinstance(outcome, asyncio.TimeoutError):
+                    self.log(f"  ✗ {domain} - Timeout")
+                elif isinstance(outcome, Exception):
+                    self.log(f"  ✗ {domain} - No resolution")
                 else:
-                    print(f"  ✗ {domain} - No resolution")
-                    all_passed = False
-            except socket.gaierror as e:
-                print(f"  ✗ {domain} - DNS failed: {e}")
-                all_passed = False
-            except socket.timeout:
-                print(f"  ✗ {domain} - Timeout")
-                all_passed = False
+                    addr, elapsed = outcome
+                    self.log(f"  ✓ {domain} -> {addr} ({elapsed:.3f}s)")
 
         self.add_result(
             "DNS Resolution",
@@ -85,9 +417,15 @@ class InternetRestrictionChecker:
         )
         return all_passed
 
-    def check_dns_against_blocked_domains(self) -> bool:
+    async def check_dns_against_blocked_domains(self) -> bool:
         """Check if certain commonly blocked domains are accessible."""
-        print("\n[2] Checking access to commonly restricted domains...")
+        self.log("\n[2] Checking access to commonly restricted domains...")
+
+        if self._skip_if_requested("domains", "Domain Accessibility"):
+            return True
+
+        if await self._skip_if_offline("Domain Accessibility"):
+            return False
 
         # Domains that might be blocked in restricted networks
         test_domains = [
@@ -103,36 +441,45 @@ class InternetRestrictionChecker:
             "reddit.com",
         ]
 
-        blocked_count = 0
-        accessible_count = 0
+        total = len(test_domains)
+        threshold = total // 2
 
-        for domain in test_domains:
-            try:
-                socket.setdefaulttimeout(5)
-                addr = socket.gethostbyname(domain)
-                if addr:
-                    accessible_count += 1
-                    print(f"  ✓ {domain} - Accessible")
-            except socket.gaierror:
-                blocked_count += 1
-                print(f"  ✗ {domain} - Blocked/Not found")
-            except socket.timeout:
-                blocked_count += 1
-                print(f"  ✗ {domain} - Timeout")
-
-        is_restricted = blocked_count > len(test_domains) * 0.5
-        status = not is_restricted
+        outcomes = await asyncio.gather(
+            *(self._cached_resolve(domain) for domain in test_domains),
+            return_exceptions=True
+        )
+
+        blocked_count = sum(isinstance(outcome, Exception) for outcome in outcomes)
+        accessible_count = total - blocked_count
+
+        if self.verbose:
+            for domain, outcome in zip(test_domains, outcomes):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    self.log(f"  ✗ {domain} - Timeout")
+                elif isinstance(outcome, Exception):
+                    self.log(f"  ✗ {domain} - Blocked/Not found")
+                else:
+                    self.log(f"  ✓ {domain} - Accessible")
+
+        # Restricted when more than half the domains are blocked
+        status = blocked_count <= threshold
 
         self.add_result(
             "Domain Accessibility",
             status,
-            f"{accessible_count}/{len(test_domains)} domains accessible, {blocked_count} blocked"
+            f"{accessible_count}/{total} domains accessible, {blocked_count} blocked"
         )
         return status
 
-    def check_port_connectivity(self) -> bool:
+    async def check_port_connectivity(self) -> bool:
         """Check if common ports are accessible."""
-        print("\n[3] Checking port connectivity...")
+        self.log("\n[3] Checking port connectivity...")
+
+        if self._skip_if_requested("ports", "Port Connectivity"):
+            return True
+
+        if await self._skip_if_offline("Port Connectivity"):
+            return False
 
         # Common ports that might be blocked
         ports_to_check = [
@@ -143,28 +490,28 @@ class InternetRestrictionChecker:
             (443, "HTTPS", "api.github.com"),
         ]
 
-        all_passed = True
+        outcomes = await asyncio.gather(
+            *(self._connect_one(host, port) for port, _, host in ports_to_check),
+            return_exceptions=True
+        )
 
-        for port, protocol, host in ports_to_check:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                start = time.time()
-                result = sock.connect_ex((host, port))
-                elapsed = time.time() - start
-                sock.close()
-
-                if result == 0:
-                    print(f"  ✓ {host}:{port} ({protocol}) - Open ({elapsed:.3f}s)")
+        all_passed = not any(isinstance(outcome, Exception) for outcome in outcomes)
+
+        if self.verbose:
+            for (port, protocol, host), outcome in zip(ports_to_check, outcomes):
+                if isinstance(outcome, ConnectionRefusedError):
+                    self.log(f"  ✗ {host}:{port} ({protocol}) - Closed (connection refused)")
+                elif isinstance(outcome, ConnectionError):
+                    # A reset/abort during the handshake is typical of a filtering middlebox
+                    self.log(f"  ✗ {host}:{port} ({protocol}) - Blocked (connection reset)")
+                elif isinstance(outcome, asyncio.TimeoutError):
+                    self.log(f"  ✗ {host}:{port} ({protocol}) - Timeout")
+                elif isinstance(outcome, socket.gaierror):
+                    self.log(f"  ✗ {host}:{port} ({protocol}) - DNS failed: {outcome}")
+                elif isinstance(outcome, Exception):
+                    self.log(f"  ✗ {host}:{port} ({protocol}) - Error: {outcome}")
                 else:
-                    print(f"  ✗ {host}:{port} ({protocol}) - Closed/Blocked")
-                    all_passed = False
-            except socket.timeout:
-                print(f"  ✗ {host}:{port} ({protocol}) - Timeout")
-                all_passed = False
-            except Exception as e:
-                print(f"  ✗ {host}:{port} ({protocol}) - Error: {e}")
-                all_passed = False
+                    self.log(f"  ✓ {host}:{port} ({protocol}) - Open ({outcome:.3f}s)")
 
         self.add_result(
             "Port Connectivity",
@@ -173,15 +520,21 @@ class InternetRestrictionChecker:
         )
         return all_passed
 
-    def check_http_response_time(self) -> bool:
+    async def check_http_response_time(self) -> bool:
         """Check HTTP response times to detect throttling."""
-        print("\n[4] Checking HTTP response times...")
+        self.log("\n[4] Checking HTTP response times...")
+
+        if self._skip_if_requested("http", "HTTP Response Time"):
+            return True
 
-        if not REQUESTS_AVAILABLE:
-            print("  ⚠ requests library not available, skipping HTTP check")
-            self.add_result("HTTP Response Time", True, "Test skipped (requests not installed)")
+        if not HTTP_AVAILABLE:
+            self.log("  ⚠ httpx/requests library not available, skipping HTTP check")
+            self.add_result("HTTP Response Time", True, "Test skipped (httpx/requests not installed)")
             return True
 
+        if await self._skip_if_offline("HTTP Response Time"):
+            return False
+
         test_urls = [
             "https://httpbin.org/get",
             "https://api.github.com",
@@ -192,25 +545,25 @@ class InternetRestrictionChecker:
 
         for url in test_urls:
             try:
-                start = time.time()
-                response = requests.get(url, timeout=10)
-                elapsed = time.time() - start
+                start = time.perf_counter()
+                response = await self._http_get(url, timeout=10)
+                elapsed = time.perf_counter() - start
 
-                print(f"  {url} -> {response.status_code} ({elapsed:.3f}s)")
+                self.log(f"  {url} -> {response.status_code} ({elapsed:.3f}s)")
 
                 # If response takes more than 5 seconds, it might be throttled
                 if elapsed > 5:
-                    print(f"    ⚠ Warning: Slow response time detected")
+                    self.log(f"    ⚠ Warning: Slow response time detected")
                     suspicious_slow = True
 
-            except requests.exceptions.Timeout:
-                print(f"  ✗ {url} - Request timed out")
+            except _HTTP_TIMEOUT_ERRORS:
+                self.log(f"  ✗ {url} - Request timed out")
                 all_passed = False
-            except requests.exceptions.ConnectionError as e:
-                print(f"  ✗ {url} - Connection error: {e}")
+            except _HTTP_CONNECT_ERRORS as e:
+                self.log(f"  ✗ {url} - Connection error: {e}")
                 all_passed = False
             except Exception as e:
-                print(f"  ✗ {url} - Error: {e}")
+                self.log(f"  ✗ {url} - Error: {e}")
                 all_passed = False
 
         if suspicious_slow and all_passed:
@@ -227,48 +580,45 @@ class InternetRestrictionChecker:
             )
         return all_passed
 
-    def check_mtu_size(self) -> bool:
+    async def check_mtu_size(self) -> bool:
         """Check if there are MTU issues that might indicate network problems."""
-        print("\n[5] Checking MTU/fragmentation...")
+        self.log("\n[5] Checking MTU/fragmentation...")
+
+        if self._skip_if_requested("mtu", "MTU Check"):
+            return True
 
         # Try to ping with different packet sizes
         try:
             # On macOS, use -D flag; on Linux, use -M
             if sys.platform == "darwin":
-                result = subprocess.run(
-                    ["ping", "-D", "-c", "3", "-s", "1400", "8.8.8.8"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                args = ["-D", "-c", "3", "-s", "1400", "8.8.8.8"]
             else:
-                result = subprocess.run(
-                    ["ping", "-c", "3", "-s", "1400", "-M", "dont", "8.8.8.8"],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                args = ["-c", "3", "-s", "1400", "-M", "dont", "8.8.8.8"]
+            returncode, _ = await self._ping(args, timeout=10)
 
-            if result.returncode == 0:
-                print("  ✓ MTU check passed (packets of 1400 bytes OK)")
+            if returncode == 0:
+                self.log("  ✓ MTU check passed (packets of 1400 bytes OK)")
                 self.add_result("MTU Check", True, "No fragmentation issues detected")
                 return True
             else:
-                print("  ⚠ MTU issue detected")
+                self.log("  ⚠ MTU issue detected")
                 self.add_result("MTU Check", False, "Potential MTU/fragmentation issues")
                 return False
-        except subprocess.TimeoutExpired:
-            print("  ✗ Ping timed out")
+        except asyncio.TimeoutError:
+            self.log("  ✗ Ping timed out")
             self.add_result("MTU Check", False, "Ping timeout")
             return False
         except Exception as e:
-            print(f"  ⚠ Could not perform MTU check: {e}")
+            self.log(f"  ⚠ Could not perform MTU check: {e}")
             self.add_result("MTU Check", True, "Test could not be completed")
             return True
 
-    def check_dns_servers(self) -> bool:
+    async def check_dns_servers(self) -> bool:
         """Check if DNS servers are being intercepted or blocked."""
-        print("\n[6] Checking DNS server integrity...")
+        self.log("\n[6] Checking DNS server integrity...")
+
+        if self._skip_if_requested("dns-servers", "DNS Server Check"):
+            return True
 
         dns_servers = [
             ("8.8.8.8", "Google DNS"),
@@ -276,18 +626,20 @@ class InternetRestrictionChecker:
             ("8.8.4.4", "Google DNS Secondary"),
         ]
 
-        all_passed = True
+        # Try to resolve a domain using the specific DNS
+        outcomes = await asyncio.gather(
+            *(self._cached_resolve("example.com", dns_ip, timeout=3, refresh=True) for dns_ip, _ in dns_servers),
+            return_exceptions=True
+        )
 
-        for dns_ip, dns_name in dns_servers:
-            try:
-                socket.setdefaulttimeout(3)
-                # Try to resolve a domain using the specific DNS
-                result = socket.gethostbyname("example.com")
-                if result:
-                    print(f"  ✓ {dns_name} ({dns_ip}) - Responding")
-            except socket.error:
-                print(f"  ✗ {dns_name} ({dns_ip}) - Not responding")
-                all_passed = False
+        all_passed = not any(isinstance(outcome, Exception) for outcome in outcomes)
+
+        if self.verbose:
+            for (dns_ip, dns_name), outcome in zip(dns_servers, outcomes):
+                if isinstance(outcome, Exception):
+                    self.log(f"  ✗ {dns_name} ({dns_ip}) - Not responding")
+                else:
+                    self.log(f"  ✓ {dns_name} ({dns_ip}) - Responding")
 
         self.add_result(
             "DNS Server Check",
@@ -296,66 +648,81 @@ class InternetRestrictionChecker:
         )
         return all_passed
 
-    def check_packet_loss(self) -> bool:
+    async def check_packet_loss(self) -> bool:
         """Check for packet loss using ping."""
-        print("\n[7] Checking for packet loss...")
+        self.log("\n[7] Checking for packet loss...")
+
+        if self._skip_if_requested("ping", "Packet Loss"):
+            return True
 
         try:
-            # Try to ping 8.8.8.8 (Google DNS)
-            if sys.platform == "darwin":
-                result = subprocess.run(
-                    ["ping", "-c", "5", "8.8.8.8"],
-                    capture_output=True,
-                    text=True,
-                    timeout=15
-                )
+            # Try to ping 8.8.8.8 (Google DNS); 0.2s is the lowest interval
+            # unprivileged users may set, and 3 in-order replies settle it
+            returncode, output = await self._ping(
+                ["-i", "0.2", "-c", "5", "8.8.8.8"], timeout=15, stop_after=3
+            )
+
+            # Parse packet loss and average RTT from output; an early stop
+            # means no loss and leaves no summary line to read
+            if returncode is None:
+                loss = 0.0
             else:
-                result = subprocess.run(
-                    ["ping", "-c", "5", "8.8.8.8"],
-                    capture_output=True,
-                    text=True,
-                    timeout=15
-                )
+                match = _PING_LOSS_RE.search(output)
+                loss = float(match.group(1)) if match else 100.0
 
-            output = result.stdout
+            match = _PING_RTT_RE.search(output)
+            if match:
+                avg_rtt = float(match.group(1))
+            else:
+                times = [float(t) for t in _PING_TIME_RE.findall(output)]
+                avg_rtt = sum(times) / len(times) if times else None
+            rtt_note = f", avg RTT {avg_rtt:.1f}ms" if avg_rtt is not None else ""
 
-            # Parse packet loss from output
-            if "0% packet loss" in output or "0.0% packet loss" in output:
-                print("  ✓ No packet loss detected")
-                self.add_result("Packet Loss", True, "Connection stable")
+            if loss == 0:
+                self.log(f"  ✓ No packet loss detected{rtt_note}")
+                self.add_result("Packet Loss", True, f"Connection stable{rtt_note}")
                 return True
-            elif "100% packet loss" in output:
-                print("  ✗ 100% packet loss - connection may be blocked")
-                self.add_result("Packet Loss", False, "Complete packet loss detected")
+            elif loss < 20:
+                self.log(f"  ⚠ Minor packet loss ({loss:g}%){rtt_note}")
+                self.add_result("Packet Loss", True, f"Minor packet loss ({loss:g}%){rtt_note}")
+                return True
+            elif loss < 100:
+                self.log(f"  ✗ {loss:g}% packet loss - connection may be partially restricted")
+                self.add_result("Packet Loss", False, f"Partial packet loss ({loss:g}%){rtt_note}")
                 return False
             else:
-                # Some packet loss
-                print(f"  ⚠ Some packet loss detected: {output}")
-                self.add_result("Packet Loss", False, "Packet loss detected")
+                self.log("  ✗ 100% packet loss - connection may be blocked")
+                self.add_result("Packet Loss", False, "Complete packet loss detected")
                 return False
 
-        except subprocess.TimeoutExpired:
-            print("  ✗ Ping timed out - possible network issue")
+        except asyncio.TimeoutError:
+            self.log("  ✗ Ping timed out - possible network issue")
             self.add_result("Packet Loss", False, "Ping timeout")
             return False
         except FileNotFoundError:
-            print("  ⚠ ping command not available")
+            self.log("  ⚠ ping command not available")
             self.add_result("Packet Loss", True, "Test skipped (ping not available)")
             return True
         except Exception as e:
-            print(f"  ⚠ Could not check packet loss: {e}")
+            self.log(f"  ⚠ Could not check packet loss: {e}")
             self.add_result("Packet Loss", True, "Test could not be completed")
             return True
 
-    def check_http_vs_https(self) -> bool:
+    async def check_http_vs_https(self) -> bool:
         """Compare HTTP and HTTPS response to detect deep packet inspection."""
-        print("\n[8] Checking for potential deep packet inspection (DPI)...")
+        self.log("\n[8] Checking for potential deep packet inspection (DPI)...")
 
-        if not REQUESTS_AVAILABLE:
-            print("  ⚠ requests library not available, skipping DPI check")
+        if self._skip_if_requested("dpi", "DPI/Throttling Check"):
+            return True
+
+        if not HTTP_AVAILABLE:
+            self.log("  ⚠ httpx/requests library not available, skipping DPI check")
             self.add_result("DPI Check", True, "Test skipped")
             return True
 
+        if await self._skip_if_offline("DPI/Throttling Check"):
+            return False
+
         # Test if HTTPS is being throttled differently than HTTP
         test_url_http = "http://httpbin.org/get"
         test_url_https = "https://httpbin.org/get"
@@ -363,26 +730,37 @@ class InternetRestrictionChecker:
         http_time = None
         https_time = None
 
+        # Fetch both at once on a dedicated client, so neither scheme rides on
+        # a connection another check already warmed up
+        client = _new_http_client() if HTTPX_AVAILABLE else requests.Session()
         try:
-            start = time.time()
-            response = requests.get(test_url_http, timeout=10)
-            http_time = time.time() - start
-            print(f"  HTTP: {response.status_code} ({http_time:.3f}s)")
-        except Exception as e:
-            print(f"  HTTP: Failed - {e}")
+            http_outcome, https_outcome = await asyncio.gather(
+                self._timed(self._http_get(test_url_http, timeout=10, client=client)),
+                self._timed(self._http_get(test_url_https, timeout=10, client=client)),
+                return_exceptions=True
+            )
+        finally:
+            if HTTPX_AVAILABLE:
+                await client.aclose()
+            else:
+                client.close()
 
-        try:
-            start = time.time()
-            response = requests.get(test_url_https, timeout=10)
-            https_time = time.time() - start
-            print(f"  HTTPS: {response.status_code} ({https_time:.3f}s)")
-        except Exception as e:
-            print(f"  HTTPS: Failed - {e}")
+        if isinstance(http_outcome, Exception):
+            self.log(f"  HTTP: Failed - {http_outcome}")
+        else:
+            response, http_time = http_outcome
+            self.log(f"  HTTP: {response.status_code} ({http_time:.3f}s)")
+
+        if isinstance(https_outcome, Exception):
+            self.log(f"  HTTPS: Failed - {https_outcome}")
+        else:
+            response, https_time = https_outcome
+            self.log(f"  HTTPS: {response.status_code} ({https_time:.3f}s)")
 
         if http_time and https_time:
             # If HTTPS is significantly slower, might indicate DPI
             if https_time > http_time * 3:
-                print("  ⚠ HTTPS significantly slower than HTTP - possible throttling")
+                self.log("  ⚠ HTTPS significantly slower than HTTP - possible throttling")
                 self.add_result(
                     "DPI/Throttling Check",
                     False,
@@ -390,7 +768,7 @@ class InternetRestrictionChecker:
                 )
                 return False
 
-        print("  ✓ No significant difference between HTTP and HTTPS")
+        self.log("  ✓ No significant difference between HTTP and HTTPS")
         self.add_result("DPI/Throttling Check", True, "No obvious throttling detected")
         return True
 
@@ -408,55 +786,177 @@ class InternetRestrictionChecker:
 
         return passed_tests, total_tests
 
-    def run_all_checks(self) -> Dict:
+    async def run_all_checks(self) -> Dict:
         """Run all internet restriction checks."""
-        print("=" * 60)
-        print("INTERNET RESTRICTION CHECKER")
-        print("=" * 60)
-        print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # Run all checks
-        self.check_dns_resolution()
-        self.check_dns_against_blocked_domains()
-        self.check_port_connectivity()
-        self.check_http_response_time()
-        self.check_mtu_size()
-        self.check_dns_servers()
-        self.check_packet_loss()
-        self.check_http_vs_https()
+        self._reset()
+
+        self.log("=" * 60)
+        self.log("INTERNET RESTRICTION CHECKER")
+        self.log("=" * 60)
+        self.log(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        # Run all checks concurrently; they are almost entirely network waits.
+        # Each check's output is written as one block, in run order.
+        tasks = [
+            asyncio.ensure_future(self._buffered(check)) for check in (
+                self.check_dns_resolution(),
+                self.check_dns_against_blocked_domains(),
+                self.check_port_connectivity(),
+                self.check_http_response_time(),
+                self.check_mtu_size(),
+                self.check_dns_servers(),
+                self.check_packet_loss(),
+                self.check_http_vs_https(),
+            )
+        ]
+        for task in tasks:
+            lines, records = await task
+            if lines:
+                print("\n".join(lines), file=self.out, flush=True)
+            for record in records:
+                self._record_result(record)
 
         # Calculate overall status
         passed, total = self.calculate_overall_status()
 
         # Print summary
-        print("\n" + "=" * 60)
-        print("SUMMARY")
-        print("=" * 60)
-        print(f"Tests passed: {passed}/{total}")
-        print(f"Overall status: {self.results['overall_status'].replace('_', ' ').title()}")
+        self.log("\n" + "=" * 60)
+        self.log("SUMMARY")
+        self.log("=" * 60)
+        self.log(f"Tests passed: {passed}/{total}")
+        self.log(f"Overall status: {self.results['overall_status'].replace('_', ' ').title()}")
 
         if self.results["issues_found"]:
-            print("\nPotential issues detected:")
+            self.log("\nPotential issues detected:")
             for issue in self.results["issues_found"]:
-                print(f"  - {issue}")
+                self.log(f"  - {issue}")
         else:
-            print("\nNo significant issues detected.")
+            self.log("\nNo significant issues detected.")
 
-        print("=" * 60)
+        self.log("=" * 60)
 
         return self.results
 
 
-def main():
+async def _run_once(checker: InternetRestrictionChecker) -> Dict:
+    """Run the checks a single time and release the checker's connections."""
+    try:
+        return await checker.run_all_checks()
+    finally:
+        await checker.aclose()
+
+
+async def _monitor(checker: InternetRestrictionChecker, interval: float):
+    """Run the checks forever, printing one JSON line per run to stdout."""
+    try:
+        while True:
+            results = await checker.run_all_checks()
+            print(_to_json(results, indent=False), flush=True)
+            await asyncio.sleep(interval)
+    finally:
+        await checker.aclose()
+
+
+def _check_list(value: str) -> List[str]:
+    """Parse a comma-separated list of check names for --only."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError(f"no checks given (choose from {', '.join(CHECK_NAMES)})")
+    unknown = [name for name in names if name not in CHECK_NAMES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown check(s): {', '.join(unknown)} (choose from {', '.join(CHECK_NAMES)})"
+        )
+    return names
+
+
+def _positive_int(value: str) -> int:
+    """Parse a strictly positive integer option value."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    """Parse a strictly positive number of seconds."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(
+        description="Detect if your internet connection is being restricted, throttled, or blocked."
+    )
+    parser.add_argument("--json", action="store_true",
+                        help="save results to a timestamped JSON file")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print the summary, not per-check details")
+    parser.add_argument("--skip-dns", action="store_true",
+                        help="skip every check that needs name resolution (only ping-based checks run)")
+    parser.add_argument("--skip-http", action="store_true",
+                        help="skip the HTTP response time and DPI checks")
+    parser.add_argument("--only", type=_check_list, metavar="CHECKS",
+                        help=f"comma-separated checks to run: {','.join(CHECK_NAMES)}")
+    parser.add_argument("--dns-concurrency", type=_positive_int, default=16, metavar="N",
+                        help="maximum DNS lookups in flight (default: 16)")
+    parser.add_argument("--tcp-concurrency", type=_positive_int, default=32, metavar="N",
+                        help="maximum TCP connects in flight (default: 32)")
+    parser.add_argument("--monitor", action="store_true",
+                        help="keep running and print one JSON line per run to stdout; "
+                             "the report goes to stderr")
+    parser.add_argument("--interval", type=_positive_float, default=60, metavar="SECONDS",
+                        help="seconds to wait between runs in --monitor mode (default: 60)")
+    args = parser.parse_args(argv)
+    if args.json and args.monitor:
+        parser.error("--json cannot be combined with --monitor")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point."""
-    checker = InternetRestrictionChecker()
-    results = checker.run_all_checks()
+    args = parse_args(argv)
+
+    skip_tests = set()
+    if args.skip_dns:
+        skip_tests |= DNS_DEPENDENT_CHECKS
+    if args.skip_http:
+        skip_tests |= HTTP_CHECKS
+    if args.only is not None:
+        skip_tests |= set(CHECK_NAMES) - set(args.only)
+
+    checker = InternetRestrictionChecker(
+        dns_concurrency=args.dns_concurrency,
+        tcp_concurrency=args.tcp_concurrency,
+        skip_tests=skip_tests,
+        verbose=not args.quiet,
+        out=sys.stderr if args.monitor else None
+    )
+
+    if args.monitor:
+        # Reuse the checker, its DNS cache and HTTP pool across runs
+        try:
+            asyncio.run(_monitor(checker, args.interval))
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    results = asyncio.run(_run_once(checker))
 
     # Optionally save results to JSON
-    if len(sys.argv) > 1 and sys.argv[1] == "--json":
+    if args.json:
         output_file = f"internet_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(output_file, "w") as f:
-            json.dump(results, f, indent=2)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(_to_json(results))
         print(f"\nResults saved to: {output_file}")
 
     # Exit with appropriate code